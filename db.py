@@ -1,61 +1,306 @@
 import sqlite3
 import threading
-import json
-from datetime import datetime
+import orjson
+import time
+from collections import deque
 
 DB_FILE = 'satellite_data.db'
-DB_LOCK = threading.Lock()
+# SQLite allows a single writer at a time, so writers are serialised here
+# rather than left to fail with "database is locked". Readers never take
+# this lock; WAL gives each read a consistent snapshot
+WRITE_LOCK = threading.Lock()
+_local = threading.local()
+
+# Records queued for the next batched write
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0  # seconds
+# Rows read per query when iterating over stored records
+PAGE_SIZE = 1000
+_pending = deque()
+_last_flush = time.monotonic()
+
+# Bumped by every write so a cached export can tell whether it is stale
+_data_version = 0
+# (data version, compact JSON of all records) from the last export that was
+# small enough to keep; larger exports are streamed again on every request
+EXPORT_CACHE_MAX_BYTES = 1 << 20
+_export_cache = None
+_EXPORT_LOCK = threading.Lock()
+
+# Connection tuning: WAL lets readers run alongside the writer, and
+# synchronous=NORMAL skips the per-commit fsync that WAL makes unnecessary
+# page_size only takes effect while the database file is still empty, so it
+# must come before journal_mode=WAL; 8 KiB pages halve page reads on scans
+PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Timestamps are stored as integer milliseconds since the Unix epoch and
+# formatted as ISO 8601 (UTC) by SQLite only when records are read back
+_CREATE_TELEMETRY_SQL = '''
+    CREATE TABLE IF NOT EXISTS telemetry (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER,
+        signal REAL,
+        snr REAL,
+        ber REAL,
+        temperature REAL,
+        packets_sent INTEGER,
+        packets_received INTEGER
+    )
+'''
+# Per-minute aggregates kept up to date by every batch write. Sums and a
+# sample count are stored so averages stay exact as rows are added; packet
+# counters keep the latest value seen in the minute
+_CREATE_ROLLUP_SQL = '''
+    CREATE TABLE IF NOT EXISTS telemetry_rollup_1m (
+        minute INTEGER PRIMARY KEY,
+        samples INTEGER,
+        signal_sum REAL,
+        snr_sum REAL,
+        ber_sum REAL,
+        temperature_sum REAL,
+        packets_sent INTEGER,
+        packets_received INTEGER
+    )
+'''
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache reuses the prepared statement on every call
+_INSERT_SQL = (
+    'INSERT INTO telemetry (timestamp, signal, snr, ber, temperature, packets_sent, packets_received) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?)'
+)
+_ROLLUP_SQL = '''
+    INSERT INTO telemetry_rollup_1m (minute, samples, signal_sum, snr_sum, ber_sum, temperature_sum, packets_sent, packets_received)
+    VALUES (? / 60000 * 60000, 1, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(minute) DO UPDATE SET
+        samples = samples + 1,
+        signal_sum = signal_sum + excluded.signal_sum,
+        snr_sum = snr_sum + excluded.snr_sum,
+        ber_sum = ber_sum + excluded.ber_sum,
+        temperature_sum = temperature_sum + excluded.temperature_sum,
+        packets_sent = excluded.packets_sent,
+        packets_received = excluded.packets_received
+'''
+_BACKFILL_ROLLUP_SQL = '''
+    INSERT INTO telemetry_rollup_1m (minute, samples, signal_sum, snr_sum, ber_sum, temperature_sum, packets_sent, packets_received)
+    SELECT timestamp / 60000 * 60000, COUNT(*), SUM(signal), SUM(snr), SUM(ber), SUM(temperature),
+           MAX(packets_sent), MAX(packets_received)
+    FROM telemetry GROUP BY 1
+'''
+_SELECT_PAGE_SQL = (
+    "SELECT id, strftime('%Y-%m-%dT%H:%M:%f', timestamp / 1000.0, 'unixepoch'), "
+    'signal, snr, ber, temperature, packets_sent, packets_received '
+    'FROM telemetry WHERE id > ? ORDER BY id ASC LIMIT ?'
+)
+_SELECT_ROLLUP_PAGE_SQL = (
+    "SELECT minute, strftime('%Y-%m-%dT%H:%M:%f', minute / 1000.0, 'unixepoch'), "
+    'signal_sum / samples, snr_sum / samples, ber_sum / samples, temperature_sum / samples, '
+    'packets_sent, packets_received '
+    'FROM telemetry_rollup_1m WHERE minute > ? ORDER BY minute ASC LIMIT ?'
+)
+
+# Return this thread's connection, opening and tuning it on first use
+def _get_conn():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+    return conn
+
+# Return the declared type of telemetry.timestamp, upper-cased
+def _timestamp_type(conn):
+    columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(telemetry)")}
+    return columns.get('timestamp', '').upper()
+
+# Rewrite a table created with ISO 8601 TEXT timestamps to the epoch-ms schema.
+# The schema is checked again inside the transaction because another worker
+# process may have migrated it while this one waited for the write lock
+def _migrate_text_timestamps(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if _timestamp_type(conn) == 'TEXT':
+            conn.execute("ALTER TABLE telemetry RENAME TO telemetry_text_timestamps")
+            conn.execute(_CREATE_TELEMETRY_SQL)
+            conn.execute('''
+                INSERT INTO telemetry (id, timestamp, signal, snr, ber, temperature, packets_sent, packets_received)
+                SELECT id, CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000) AS INTEGER),
+                       signal, snr, ber, temperature, packets_sent, packets_received
+                FROM telemetry_text_timestamps ORDER BY id
+            ''')
+            conn.execute("DROP TABLE telemetry_text_timestamps")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+# Build the rollup from existing rows if it is still empty, checking inside
+# the transaction so only one worker process backfills it
+def _backfill_rollup(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute('SELECT 1 FROM telemetry_rollup_1m LIMIT 1').fetchone() is None:
+            conn.execute(_BACKFILL_ROLLUP_SQL)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
 
 # Initialize the database and create tables if they don't exist
 def init_db():
-    with DB_LOCK, sqlite3.connect(DB_FILE) as conn:
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS telemetry (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                signal REAL,
-                snr REAL,
-                ber REAL,
-                temperature REAL,
-                packets_sent INTEGER,
-                packets_received INTEGER
-            )
-        ''')
-        conn.commit()
+    conn = _get_conn()
+    conn.execute(_CREATE_TELEMETRY_SQL)
+    if _timestamp_type(conn) == 'TEXT':
+        with WRITE_LOCK:
+            _migrate_text_timestamps(conn)
+    conn.execute(_CREATE_ROLLUP_SQL)
+    # Build the rollup from existing rows the first time it is created
+    if conn.execute('SELECT 1 FROM telemetry_rollup_1m LIMIT 1').fetchone() is None:
+        with WRITE_LOCK:
+            _backfill_rollup(conn)
+
+# Insert many records in a single transaction; each row is
+# (timestamp_ms, signal, snr, ber, temperature, packets_sent, packets_received)
+def insert_records_batch(rows):
+    global _data_version
+    conn = _get_conn()
+    with WRITE_LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_INSERT_SQL, rows)
+            conn.executemany(_ROLLUP_SQL, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        _data_version += 1
 
 # Insert a new telemetry/diagnostics record
 def insert_record(signal, snr, ber, temperature, packets_sent, packets_received):
-    with DB_LOCK, sqlite3.connect(DB_FILE) as conn:
-        c = conn.cursor()
-        c.execute('''
-            INSERT INTO telemetry (timestamp, signal, snr, ber, temperature, packets_sent, packets_received)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (datetime.utcnow().isoformat(), signal, snr, ber, temperature, packets_sent, packets_received))
-        conn.commit()
+    insert_records_batch([(int(time.time() * 1000), signal, snr, ber, temperature, packets_sent, packets_received)])
+
+# Queue a record to be written by the next flush_pending()
+def enqueue_record(signal, snr, ber, temperature, packets_sent, packets_received):
+    _pending.append((int(time.time() * 1000), signal, snr, ber, temperature, packets_sent, packets_received))
+
+# Write queued records once a full batch is waiting or FLUSH_INTERVAL has passed
+def flush_pending(force=False):
+    global _last_flush
+    if not _pending:
+        return 0
+    if not force and len(_pending) < BATCH_SIZE and time.monotonic() - _last_flush < FLUSH_INTERVAL:
+        return 0
+    rows = []
+    while True:
+        try:
+            rows.append(_pending.popleft())
+        except IndexError:
+            break
+    if rows:
+        try:
+            insert_records_batch(rows)
+        except Exception:
+            # Requeue in order ahead of anything queued since, so the next flush retries them
+            _pending.extendleft(reversed(rows))
+            raise
+    _last_flush = time.monotonic()
+    return len(rows)
+
+# Yield the rows of a paged SELECT as lists of record dicts, one list per
+# PAGE_SIZE rows. Pages are keyed on the first column so no cursor is held
+# open between yields
+def _iter_page_lists(select_sql):
+    last_key = 0
+    while True:
+        rows = _get_conn().execute(select_sql, (last_key, PAGE_SIZE)).fetchall()
+        yield [
+            {
+                'timestamp': row[1],
+                'signal': row[2],
+                'snr': row[3],
+                'ber': row[4],
+                'temperature': row[5],
+                'packets_sent': row[6],
+                'packets_received': row[7]
+            }
+            for row in rows
+        ]
+        if len(rows) < PAGE_SIZE:
+            return
+        last_key = rows[-1][0]
+
+# Yield the rows of a paged SELECT as record dicts
+def _iter_pages(select_sql):
+    for page in _iter_page_lists(select_sql):
+        yield from page
+
+# Yield all records as dicts in insertion order
+def iter_records():
+    return _iter_pages(_SELECT_PAGE_SQL)
+
+# Yield one averaged record per minute in time order
+def iter_rollup_records():
+    return _iter_pages(_SELECT_ROLLUP_PAGE_SQL)
 
 # Fetch all records as a list of dicts
 def fetch_all_records():
-    with DB_LOCK, sqlite3.connect(DB_FILE) as conn:
-        c = conn.cursor()
-        c.execute('SELECT timestamp, signal, snr, ber, temperature, packets_sent, packets_received FROM telemetry ORDER BY id ASC')
-        rows = c.fetchall()
-        result = []
-        for row in rows:
-            result.append({
-                'timestamp': row[0],
-                'signal': row[1],
-                'snr': row[2],
-                'ber': row[3],
-                'temperature': row[4],
-                'packets_sent': row[5],
-                'packets_received': row[6]
-            })
-        return result
-
-# Export all records as JSON
+    return list(iter_records())
+
+# Fetch per-minute averages as a list of dicts
+def fetch_rollup_records():
+    return list(iter_rollup_records())
+
+# Return the cached compact JSON of all records, or None if records were
+# written since it was built or the last export was too large to keep
+def cached_records_json():
+    with _EXPORT_LOCK:
+        if _export_cache is not None and _export_cache[0] == _data_version:
+            return _export_cache[1]
+        return None
+
+# Yield all records as a compact JSON array in chunks of one page each, so
+# the table is never held in memory at once. An export that comes to at most
+# EXPORT_CACHE_MAX_BYTES is kept for cached_records_json()
+def iter_records_json():
+    global _export_cache
+    version = _data_version
+    kept = [b'[']
+    size = 1
+    yield b'['
+    separator = b''
+    for page in _iter_page_lists(_SELECT_PAGE_SQL):
+        if not page:
+            continue
+        # Strip the brackets so pages join into one array
+        chunk = separator + orjson.dumps(page)[1:-1]
+        separator = b','
+        if kept is not None:
+            size += len(chunk)
+            if size <= EXPORT_CACHE_MAX_BYTES:
+                kept.append(chunk)
+            else:
+                kept = None
+        yield chunk
+    yield b']'
+    if kept is not None:
+        kept.append(b']')
+        with _EXPORT_LOCK:
+            # Tagged with the version seen before reading, so a write that
+            # lands during the export leaves it stale
+            _export_cache = (version, b''.join(kept))
+
+# Export all records as indented JSON (UTF-8 bytes)
 def export_all_records_json():
-    return json.dumps(fetch_all_records(), indent=2)
+    return orjson.dumps(fetch_all_records(), option=orjson.OPT_INDENT_2)
 
 # Call this at startup to ensure DB is ready
 init_db() 
\ No newline at end of file
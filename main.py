@@ -1,18 +1,33 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request, Form
-from fastapi.responses import FileResponse, JSONResponse, HTMLResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request, Form, Response
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
 import os
-from satellite_comm import SatelliteComm, BlockstreamSatelliteIntegration
+import asyncio
+import base64
+from pathlib import Path
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from satellite_comm import SatelliteComm, BlockstreamSatelliteIntegration, Cmd, STEERING_KEYS
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.middleware.gzip import GZipMiddleware
 import secrets
-import json
+from collections import OrderedDict
+from hashlib import blake2b
+import orjson
+import numpy as np
 import db
 
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
-app = FastAPI(title="Satellite Ground Station Dashboard")
+app = FastAPI(title="Satellite Ground Station Dashboard", default_response_class=ORJSONResponse)
+# Compress the dashboard page and JSON exports; tiny poll responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
 
 # Global satellite communication instance (for demo, single connection)
-comm = SatelliteComm('127.0.0.1', 5000)
+comm = SatelliteComm('127.0.0.1', 5000, thread_safe=True)  # shared by the threadpool and the sampler
 
 bsi = BlockstreamSatelliteIntegration(receiver_type='standalone')  # Change receiver_type as needed
 
@@ -21,25 +36,108 @@ class CommandRequest(BaseModel):
     command: str
     params: str = ''  # Optional, can be used for steer, etc.
 
-security = HTTPBasic()
-USERNAME = "admin"
-PASSWORD = "space123"
+USERNAME = os.environ.get("SPACECOMM_USERNAME", "admin")
+PASSWORD = os.environ.get("SPACECOMM_PASSWORD", "space123")
+
+# Verified credentials keyed by a digest of the Authorization header, so
+# repeated polls skip Basic parsing and compare_digest. Least recently used
+# entries are evicted first, and entries expire after AUTH_CACHE_TTL
+AUTH_CACHE_SIZE = 32
+AUTH_CACHE_TTL = 300  # seconds
+auth_cache = OrderedDict()
+
+class CachedHTTPBasic(HTTPBasic):
+    """HTTP Basic scheme that checks the credentials and caches headers that pass."""
+    async def __call__(self, request: Request) -> HTTPBasicCredentials:
+        key = blake2b(request.headers.get("authorization", "").encode(), digest_size=16).digest()
+        entry = auth_cache.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            auth_cache.move_to_end(key)
+            return entry[0]
+        credentials = await super().__call__(request)
+        correct_username = secrets.compare_digest(credentials.username, USERNAME)
+        correct_password = secrets.compare_digest(credentials.password, PASSWORD)
+        if not (correct_username and correct_password):
+            raise HTTPException(status_code=401, detail="Incorrect username or password", headers={"WWW-Authenticate": "Basic"})
+        auth_cache[key] = (credentials, time.monotonic() + AUTH_CACHE_TTL)
+        auth_cache.move_to_end(key)
+        if len(auth_cache) > AUTH_CACHE_SIZE:
+            auth_cache.popitem(last=False)
+        return credentials
 
-def authenticate(credentials: HTTPBasicCredentials = Depends(security)):
-    correct_username = secrets.compare_digest(credentials.username, USERNAME)
-    correct_password = secrets.compare_digest(credentials.password, PASSWORD)
-    if not (correct_username and correct_password):
-        raise HTTPException(status_code=401, detail="Incorrect username or password", headers={"WWW-Authenticate": "Basic"})
+security = CachedHTTPBasic(scheme_name="HTTPBasic")
+
+async def authenticate(credentials: HTTPBasicCredentials = Depends(security)):
     return credentials.username
 
+# SQLite work runs on its own small pool so slow queries cannot starve the
+# default threadpool that serves the sync endpoints; each worker thread
+# keeps its own connection (see db._get_conn)
+db_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='db')
+
+async def run_db(func, *args):
+    """Run a blocking database call on the database pool."""
+    return await asyncio.get_running_loop().run_in_executor(db_executor, func, *args)
+
+async def iterate_on_db_pool(iterator):
+    """Yield from a blocking iterator, advancing it on the database pool."""
+    while True:
+        item = await run_db(next, iterator, None)
+        if item is None:
+            return
+        yield item
+
+# Background tasks started with the app
+background_tasks = []
+SAMPLE_INTERVAL = 5  # seconds between telemetry samples stored in the database
+
+def sample_telemetry():
+    """Read diagnostics and packet stats once and queue them for storage."""
+    diag = comm.get_antenna_diagnostics()
+    pkt = comm.get_packet_stats()
+    record_history(diag, pkt)
+    db.enqueue_record(
+        diag['signal_strength'],
+        diag['snr_db'],
+        diag['ber'],
+        diag['temperature_c'],
+        pkt['packets_sent'],
+        pkt['packets_received']
+    )
+
+async def telemetry_sampler():
+    """Sample telemetry server-side so storage does not depend on open dashboards."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        try:
+            await loop.run_in_executor(None, sample_telemetry)
+        except Exception as e:
+            logger.error("Telemetry sampling failed: %s", e)
+
+async def flush_db_loop():
+    """Periodically write queued telemetry records to the database in batches."""
+    while True:
+        await asyncio.sleep(0.5)
+        try:
+            await run_db(db.flush_pending)
+        except Exception as e:
+            logger.error("Telemetry flush failed: %s", e)
+
 @app.on_event("startup")
-def startup_event():
-    """Connect to satellite on startup."""
+async def startup_event():
+    """Connect to satellite and start background tasks on startup."""
     comm.connect()
+    background_tasks.append(asyncio.create_task(telemetry_sampler()))
+    background_tasks.append(asyncio.create_task(flush_db_loop()))
 
 @app.on_event("shutdown")
-def shutdown_event():
-    """Disconnect from satellite on shutdown."""
+async def shutdown_event():
+    """Stop background tasks, flush pending records and disconnect from satellite on shutdown."""
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    await run_db(db.flush_pending, True)
     comm.disconnect()
 
 @app.post("/send_command")
@@ -49,23 +147,24 @@ def send_command(req: CommandRequest):
     success = comm.send_command(req.command, params_bytes)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to send command.")
-    return {"status": "Command sent", "command": req.command}
+    return ORJSONResponse({"status": "Command sent", "command": req.command})
 
 @app.get("/request_photo")
-def request_photo():
-    """Request a photo from the satellite and return as file download."""
+def request_photo(cache: bool = False):
+    """Request a photo from the satellite and return as file download; cache=1 also saves it to disk."""
     photo = comm.request_photo()
     if not photo:
         raise HTTPException(status_code=500, detail="Failed to receive photo.")
-    photo_path = "received_photo.jpg"
-    with open(photo_path, 'wb') as f:
-        f.write(photo)
-    return FileResponse(photo_path, media_type='image/jpeg', filename='satellite_photo.jpg')
+    if cache:
+        photo_path = Path("received_photo.jpg")
+        photo_path.write_bytes(photo)
+        return FileResponse(photo_path, media_type='image/jpeg', filename='satellite_photo.jpg')
+    return Response(content=memoryview(photo), media_type='image/jpeg', headers={"Content-Disposition": 'attachment; filename="satellite_photo.jpg"'})
 
 @app.get("/status")
 def status():
     """Get connection status."""
-    return {"connected": comm.connected}
+    return ORJSONResponse({"connected": comm.connected})
 
 @app.get("/telemetry", dependencies=[Depends(authenticate)])
 def get_telemetry():
@@ -73,55 +172,85 @@ def get_telemetry():
     telemetry = comm.request_telemetry()
     if not telemetry:
         raise HTTPException(status_code=500, detail="Failed to receive telemetry.")
-    return telemetry
+    return ORJSONResponse(telemetry)
+
+class SteeringTarget(BaseModel):
+    """Target position; other telemetry fields are accepted and ignored."""
+    model_config = ConfigDict(allow_inf_nan=False)
+    pos_x: float
+    pos_y: float
+    pos_z: float
 
 class SteeringRequest(BaseModel):
-    target_telemetry: dict
+    target_telemetry: SteeringTarget
 
 @app.post("/steer", dependencies=[Depends(authenticate)])
 def steer(req: SteeringRequest):
     """Calculate and send steering command to get back on proper telemetry."""
-    current_telemetry = comm.request_telemetry()
-    if not current_telemetry:
+    current_telemetry = comm.request_telemetry_vector()
+    if current_telemetry is None or np.isnan(current_telemetry[:len(STEERING_KEYS)]).any():
         raise HTTPException(status_code=500, detail="Failed to get current telemetry.")
-    params = comm.calculate_steering(current_telemetry, req.target_telemetry)
-    success = comm.send_command('steer', params)
+    params = comm.calculate_steering(current_telemetry, req.target_telemetry.model_dump())
+    if not params:
+        raise HTTPException(status_code=500, detail="Failed to calculate steering.")
+    success = comm.send_command(Cmd.STEER, params)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to send steer command.")
-    return {"status": "Steering command sent"}
+    return ORJSONResponse({"status": "Steering command sent"})
 
 @app.post("/connect_with_signal", dependencies=[Depends(authenticate)])
 def connect_with_signal(min_signal: float = 0.5):
     """Attempt to connect to the satellite based on antenna signal strength."""
     result = comm.connect_with_antenna_signal(min_signal=min_signal)
     signal = comm.get_antenna_signal_strength()
-    return {"connected": comm.connected, "signal_strength": signal, "result": result}
+    return ORJSONResponse({"connected": comm.connected, "signal_strength": signal, "result": result})
+
+# Serialized /signal_strength body shared by all clients polling within the TTL
+SIGNAL_CACHE_TTL = 0.2  # seconds
+signal_cache = (0.0, b'')  # (expiry on the monotonic clock, JSON body)
 
 @app.get("/signal_strength", dependencies=[Depends(authenticate)])
 def signal_strength():
     """Get the current antenna signal strength (live)."""
-    return {"signal_strength": comm.get_current_signal_strength()}
+    global signal_cache
+    expires, body = signal_cache
+    now = time.monotonic()
+    if now >= expires:
+        body = orjson.dumps({"signal_strength": comm.get_current_signal_strength()})
+        signal_cache = (now + SIGNAL_CACHE_TTL, body)
+    return Response(content=body, media_type="application/json")
 
 @app.get("/antenna_diagnostics", dependencies=[Depends(authenticate)])
 def antenna_diagnostics():
     """Get advanced antenna diagnostics."""
-    return comm.get_antenna_diagnostics()
+    return ORJSONResponse(comm.get_antenna_diagnostics())
 
 @app.get("/packet_stats", dependencies=[Depends(authenticate)])
 def packet_stats():
     """Get the number of packets sent and received."""
-    return comm.get_packet_stats()
+    return ORJSONResponse(comm.get_packet_stats())
 
-# In-memory storage for historical data and alert thresholds
+@app.get("/tick", dependencies=[Depends(authenticate)])
+def tick():
+    """Get signal strength, antenna diagnostics and packet stats for one dashboard refresh."""
+    return ORJSONResponse({
+        "signal_strength": comm.get_current_signal_strength(),
+        "diagnostics": comm.get_antenna_diagnostics(),
+        "packets": comm.get_packet_stats()
+    }, headers={"Cache-Control": "no-cache"})
+
+# In-memory ring buffer of recent samples (one array per field) and alert thresholds
+HISTORY_LENGTH = 1800  # samples kept in memory
 historical_data = {
-    'signal': [],
-    'snr': [],
-    'ber': [],
-    'temperature': [],
-    'packets_sent': [],
-    'packets_received': [],
-    'timestamps': []
+    'signal': np.zeros(HISTORY_LENGTH, dtype=np.float32),
+    'snr': np.zeros(HISTORY_LENGTH, dtype=np.float32),
+    'ber': np.zeros(HISTORY_LENGTH, dtype=np.float32),
+    'temperature': np.zeros(HISTORY_LENGTH, dtype=np.float32),
+    'packets_sent': np.zeros(HISTORY_LENGTH, dtype=np.int64),
+    'packets_received': np.zeros(HISTORY_LENGTH, dtype=np.int64),
+    'timestamps': np.zeros(HISTORY_LENGTH, dtype=np.int64)  # epoch milliseconds
 }
+history_head = 0  # total samples written; the next slot is history_head % HISTORY_LENGTH
 alert_thresholds = {
     'signal_strength': 0.3,
     'snr_db': 15,
@@ -129,37 +258,79 @@ alert_thresholds = {
     'temperature_c': 50
 }
 
+def record_history(diag, pkt):
+    """Write one sample into the in-memory ring buffer, overwriting the oldest."""
+    global history_head
+    i = history_head % HISTORY_LENGTH
+    historical_data['signal'][i] = diag['signal_strength']
+    historical_data['snr'][i] = diag['snr_db']
+    historical_data['ber'][i] = diag['ber']
+    historical_data['temperature'][i] = diag['temperature_c']
+    historical_data['packets_sent'][i] = pkt['packets_sent']
+    historical_data['packets_received'][i] = pkt['packets_received']
+    historical_data['timestamps'][i] = int(time.time() * 1000)
+    history_head += 1
+
+def history_snapshot():
+    """Return the buffered samples per field in chronological order, oldest first."""
+    count = min(history_head, HISTORY_LENGTH)
+    order = np.arange(history_head - count, history_head) % HISTORY_LENGTH
+    return {key: values[order] for key, values in historical_data.items()}
+
+@app.get("/recent_history", dependencies=[Depends(authenticate)])
+def recent_history():
+    """Get the most recent samples held in memory, one array per field."""
+    body = orjson.dumps(history_snapshot(), option=orjson.OPT_SERIALIZE_NUMPY)
+    return Response(content=body, media_type="application/json")
+
 @app.get("/historical_data", dependencies=[Depends(authenticate)])
-def get_historical_data():
-    """Export historical data as JSON from persistent storage."""
-    return db.fetch_all_records()
+async def get_historical_data(resolution: str = 'raw'):
+    """Export historical data as JSON from persistent storage; resolution=1m returns per-minute averages."""
+    if resolution == 'raw':
+        cached = await run_db(db.cached_records_json)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        return StreamingResponse(iterate_on_db_pool(db.iter_records_json()), media_type="application/json")
+    if resolution == '1m':
+        records = await run_db(db.fetch_rollup_records)
+        return Response(content=orjson.dumps(records), media_type="application/json")
+    raise HTTPException(status_code=400, detail="resolution must be 'raw' or '1m'.")
+
+class Thresholds(BaseModel):
+    signal_strength: Optional[float] = None
+    snr_db: Optional[float] = None
+    ber: Optional[float] = None
+    temperature_c: Optional[float] = None
 
 @app.post("/set_alert_thresholds", dependencies=[Depends(authenticate)])
-def set_alert_thresholds(request: Request):
-    """Set user-configurable alert thresholds."""
-    data = json.loads(request._body.decode()) if hasattr(request, '_body') else {}
+async def set_alert_thresholds(req: Thresholds):
+    """Set user-configurable alert thresholds; omitted fields keep their current value."""
     for key in alert_thresholds:
-        if key in data:
-            alert_thresholds[key] = float(data[key])
-    return {"status": "Thresholds updated", "thresholds": alert_thresholds}
+        value = getattr(req, key)
+        if value is not None:
+            alert_thresholds[key] = value
+    refresh_dashboard()
+    return ORJSONResponse({"status": "Thresholds updated", "thresholds": alert_thresholds})
 
 @app.post("/send_satellite_file", dependencies=[Depends(authenticate)])
 def send_satellite_file(file_path: str = Form(...), bid_msat: int = Form(10000)):
     """Send a file via Blockstream Satellite, automate payment, and update charts/alerts."""
     result = bsi.send_file_and_broadcast(file_path, bid_msat)
     if result:
-        return {"status": "Broadcast complete!"}
+        return ORJSONResponse({"status": "Broadcast complete!"})
     else:
-        return {"status": "Broadcast failed or timed out."}
+        return ORJSONResponse({"status": "Broadcast failed or timed out."})
 
-@app.get("/dashboard", response_class=HTMLResponse)
-def advanced_dashboard(username: str = Depends(authenticate)):
+def render_dashboard():
+    """Render the advanced dashboard page for the current alert thresholds."""
+    auth_b64 = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
     html_content = f"""
     <html>
     <head>
         <title>Advanced Satellite Dashboard</title>
         <script src='https://cdn.jsdelivr.net/npm/chart.js'></script>
         <script>
+        const AUTH = 'Basic {auth_b64}';
         let signalHistory = [];
         let snrHistory = [];
         let berHistory = [];
@@ -169,118 +340,83 @@ def advanced_dashboard(username: str = Depends(authenticate)):
         let receivedHistory = [];
         let packetTimeHistory = [];
         let signalChart, packetChart, snrChart, berChart, tempChart;
-        let alertThresholds = {signal_strength: {alert_thresholds['signal_strength']}, snr_db: {alert_thresholds['snr_db']}, ber: {alert_thresholds['ber']}, temperature_c: {alert_thresholds['temperature_c']}};
-        function updateSignalStrength() {{
-            fetch('/signal_strength', {{headers: {{Authorization: 'Basic ' + btoa('admin:space123')}}}})
+        let alertThresholds = {{signal_strength: {alert_thresholds['signal_strength']}, snr_db: {alert_thresholds['snr_db']}, ber: {alert_thresholds['ber']}, temperature_c: {alert_thresholds['temperature_c']}}};
+        let tickCount = 0;
+        function tick() {{
+            fetch('/tick', {{headers: {{Authorization: AUTH}}}})
                 .then(response => response.json())
                 .then(data => {{
-                    document.getElementById('signal_strength').innerText = data.signal_strength.toFixed(2);
-                    let now = new Date().toLocaleTimeString();
-                    signalHistory.push(data.signal_strength);
-                    timeHistory.push(now);
-                    if (signalHistory.length > 30) {{ signalHistory.shift(); timeHistory.shift(); }}
-                    if (signalChart) {{
-                        signalChart.data.labels = timeHistory;
-                        signalChart.data.datasets[0].data = signalHistory;
-                        signalChart.update();
-                    }}
+                    updateSignalStrength(data.signal_strength);
+                    updatePacketStats(data.packets);
+                    // Diagnostics and alerts are refreshed every 5 ticks
+                    if (tickCount % 5 === 0) updateDiagnostics(data.diagnostics);
+                    tickCount++;
                 }});
         }}
-        function updateDiagnostics() {{
-            fetch('/antenna_diagnostics', {{headers: {{Authorization: 'Basic ' + btoa('admin:space123')}}}})
-                .then(response => response.json())
-                .then(data => {{
-                    document.getElementById('diagnostics').innerText = JSON.stringify(data, null, 2);
-                    // Alert if status is WARNING or thresholds exceeded
-                    let alertMsg = '';
-                    if (data.status && data.status !== 'OK') {{
-                        alertMsg = 'ALERT: ' + data.status;
-                    }}
-                    if (data.signal_strength < alertThresholds.signal_strength) {{
-                        alertMsg += ' Signal below threshold!';
-                        alert('Signal below threshold!');
-                    }}
-                    if (data.snr_db < alertThresholds.snr_db) {{
-                        alertMsg += ' SNR below threshold!';
-                        alert('SNR below threshold!');
-                    }}
-                    if (data.ber > alertThresholds.ber) {{
-                        alertMsg += ' BER above threshold!';
-                        alert('BER above threshold!');
-                    }}
-                    if (data.temperature_c > alertThresholds.temperature_c) {{
-                        alertMsg += ' Temperature above threshold!';
-                        alert('Temperature above threshold!');
-                    }}
-                    document.getElementById('alert').innerText = alertMsg;
-                    document.getElementById('alert').style.color = alertMsg ? 'red' : '';
-                    // Update charts and historical data
-                    snrHistory.push(data.snr_db);
-                    berHistory.push(data.ber);
-                    tempHistory.push(data.temperature_c);
-                    if (snrHistory.length > 30) snrHistory.shift();
-                    if (berHistory.length > 30) berHistory.shift();
-                    if (tempHistory.length > 30) tempHistory.shift();
-                    if (snrChart) {{ snrChart.data.labels = timeHistory; snrChart.data.datasets[0].data = snrHistory; snrChart.update(); }}
-                    if (berChart) {{ berChart.data.labels = timeHistory; berChart.data.datasets[0].data = berHistory; berChart.update(); }}
-                    if (tempChart) {{ tempChart.data.labels = timeHistory; tempChart.data.datasets[0].data = tempHistory; tempChart.update(); }}
-                    // Store historical data
-                    fetch('/packet_stats', {{headers: {{Authorization: 'Basic ' + btoa('admin:space123')}}}})
-                        .then(resp => resp.json())
-                        .then(pkt => {{
-                            sentHistory.push(pkt.packets_sent);
-                            receivedHistory.push(pkt.packets_received);
-                            packetTimeHistory.push(new Date().toLocaleTimeString());
-                            if (sentHistory.length > 30) {{ sentHistory.shift(); receivedHistory.shift(); packetTimeHistory.shift(); }}
-                            // Store in server-side historical_data
-                            fetch('/historical_data', {{headers: {{Authorization: 'Basic ' + btoa('admin:space123')}}}})
-                                .then(histResp => histResp.json())
-                                .then(hist => {{
-                                    // Only push if new
-                                    if (hist.timestamps.length === 0 || hist.timestamps[hist.timestamps.length-1] !== timeHistory[timeHistory.length-1]) {{
-                                        fetch('/historical_data', {{method: 'POST', headers: {{'Content-Type': 'application/json', Authorization: 'Basic ' + btoa('admin:space123')}}, body: JSON.stringify({{
-                                            signal: signalHistory,
-                                            snr: snrHistory,
-                                            ber: berHistory,
-                                            temperature: tempHistory,
-                                            packets_sent: sentHistory,
-                                            packets_received: receivedHistory,
-                                            timestamps: timeHistory
-                                        }})}});
-                                    }}
-                                }});
-                            // Store in persistent DB
-                            db.insert_record(
-                                data.signal_strength,
-                                data.snr_db,
-                                data.ber,
-                                data.temperature_c,
-                                pkt.packets_sent,
-                                pkt.packets_received
-                            );
-                            // TODO: Add hooks here for advanced analytics (moving averages, trends, etc.)
-                            // TODO: Add hooks here for email/SMS notifications if thresholds are exceeded
-                        }});
-                }});
+        function updateSignalStrength(signalStrength) {{
+            document.getElementById('signal_strength').innerText = signalStrength.toFixed(2);
+            let now = new Date().toLocaleTimeString();
+            signalHistory.push(signalStrength);
+            timeHistory.push(now);
+            if (signalHistory.length > 30) {{ signalHistory.shift(); timeHistory.shift(); }}
+            if (signalChart) {{
+                signalChart.data.labels = timeHistory;
+                signalChart.data.datasets[0].data = signalHistory;
+                signalChart.update();
+            }}
         }}
-        function updatePacketStats() {{
-            fetch('/packet_stats', {{headers: {{Authorization: 'Basic ' + btoa('admin:space123')}}}})
-                .then(response => response.json())
-                .then(data => {{
-                    document.getElementById('packets_sent').innerText = data.packets_sent;
-                    document.getElementById('packets_received').innerText = data.packets_received;
-                    let now = new Date().toLocaleTimeString();
-                    sentHistory.push(data.packets_sent);
-                    receivedHistory.push(data.packets_received);
-                    packetTimeHistory.push(now);
-                    if (sentHistory.length > 30) {{ sentHistory.shift(); receivedHistory.shift(); packetTimeHistory.shift(); }}
-                    if (packetChart) {{
-                        packetChart.data.labels = packetTimeHistory;
-                        packetChart.data.datasets[0].data = sentHistory;
-                        packetChart.data.datasets[1].data = receivedHistory;
-                        packetChart.update();
-                    }}
-                }});
+        function updateDiagnostics(data) {{
+            document.getElementById('diagnostics').innerText = JSON.stringify(data, null, 2);
+            // Alert if status is WARNING or thresholds exceeded
+            let alertMsg = '';
+            if (data.status && data.status !== 'OK') {{
+                alertMsg = 'ALERT: ' + data.status;
+            }}
+            if (data.signal_strength < alertThresholds.signal_strength) {{
+                alertMsg += ' Signal below threshold!';
+                alert('Signal below threshold!');
+            }}
+            if (data.snr_db < alertThresholds.snr_db) {{
+                alertMsg += ' SNR below threshold!';
+                alert('SNR below threshold!');
+            }}
+            if (data.ber > alertThresholds.ber) {{
+                alertMsg += ' BER above threshold!';
+                alert('BER above threshold!');
+            }}
+            if (data.temperature_c > alertThresholds.temperature_c) {{
+                alertMsg += ' Temperature above threshold!';
+                alert('Temperature above threshold!');
+            }}
+            document.getElementById('alert').innerText = alertMsg;
+            document.getElementById('alert').style.color = alertMsg ? 'red' : '';
+            // Update charts
+            snrHistory.push(data.snr_db);
+            berHistory.push(data.ber);
+            tempHistory.push(data.temperature_c);
+            if (snrHistory.length > 30) snrHistory.shift();
+            if (berHistory.length > 30) berHistory.shift();
+            if (tempHistory.length > 30) tempHistory.shift();
+            if (snrChart) {{ snrChart.data.labels = timeHistory; snrChart.data.datasets[0].data = snrHistory; snrChart.update(); }}
+            if (berChart) {{ berChart.data.labels = timeHistory; berChart.data.datasets[0].data = berHistory; berChart.update(); }}
+            if (tempChart) {{ tempChart.data.labels = timeHistory; tempChart.data.datasets[0].data = tempHistory; tempChart.update(); }}
+            // TODO: Add hooks here for advanced analytics (moving averages, trends, etc.)
+            // TODO: Add hooks here for email/SMS notifications if thresholds are exceeded
+        }}
+        function updatePacketStats(data) {{
+            document.getElementById('packets_sent').innerText = data.packets_sent;
+            document.getElementById('packets_received').innerText = data.packets_received;
+            let now = new Date().toLocaleTimeString();
+            sentHistory.push(data.packets_sent);
+            receivedHistory.push(data.packets_received);
+            packetTimeHistory.push(now);
+            if (sentHistory.length > 30) {{ sentHistory.shift(); receivedHistory.shift(); packetTimeHistory.shift(); }}
+            if (packetChart) {{
+                packetChart.data.labels = packetTimeHistory;
+                packetChart.data.datasets[0].data = sentHistory;
+                packetChart.data.datasets[1].data = receivedHistory;
+                packetChart.update();
+            }}
         }}
         function setupCharts() {{
             const ctx = document.getElementById('signalChart').getContext('2d');
@@ -317,14 +453,10 @@ def advanced_dashboard(username: str = Depends(authenticate)):
                 options: {{scales: {{y: {{min: -30, max: 80}}}}}}
             }});
         }}
-        setInterval(updateSignalStrength, 1000);
-        setInterval(updateDiagnostics, 5000);
-        setInterval(updatePacketStats, 1000);
+        setInterval(tick, 1000);
         window.onload = function() {{
             setupCharts();
-            updateSignalStrength();
-            updateDiagnostics();
-            updatePacketStats();
+            tick();
         }}
         function setThresholds() {{
             let s = parseFloat(document.getElementById('th_signal').value);
@@ -335,12 +467,12 @@ def advanced_dashboard(username: str = Depends(authenticate)):
             alertThresholds.snr_db = snr;
             alertThresholds.ber = ber;
             alertThresholds.temperature_c = t;
-            fetch('/set_alert_thresholds', {{method: 'POST', headers: {{'Content-Type': 'application/json', Authorization: 'Basic ' + btoa('admin:space123')}}, body: JSON.stringify(alertThresholds)}})
+            fetch('/set_alert_thresholds', {{method: 'POST', headers: {{'Content-Type': 'application/json', Authorization: AUTH}}, body: JSON.stringify(alertThresholds)}})
                 .then(resp => resp.json())
                 .then(data => alert('Thresholds updated!'));
         }}
         function exportHistory() {{
-            fetch('/historical_data', {{headers: {{Authorization: 'Basic ' + btoa('admin:space123')}}}})
+            fetch('/historical_data', {{headers: {{Authorization: AUTH}}}})
                 .then(resp => resp.json())
                 .then(data => {{
                     const blob = new Blob([JSON.stringify(data, null, 2)], {{type: 'application/json'}});
@@ -357,7 +489,7 @@ def advanced_dashboard(username: str = Depends(authenticate)):
             const bidMsat = document.getElementById('sat_bid_msat').value;
             fetch('/send_satellite_file', {{
                 method: 'POST',
-                headers: {{'Authorization': 'Basic ' + btoa('admin:space123'), 'Content-Type': 'application/x-www-form-urlencoded'}},
+                headers: {{'Authorization': AUTH, 'Content-Type': 'application/x-www-form-urlencoded'}},
                 body: `file_path=${{encodeURIComponent(filePath)}}&bid_msat=${{encodeURIComponent(bidMsat)}}`
             }})
             .then(resp => resp.json())
@@ -438,7 +570,27 @@ def advanced_dashboard(username: str = Depends(authenticate)):
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content)
+    return html_content.encode()
+
+def refresh_dashboard():
+    """Re-render the dashboard page and the ETag browsers revalidate it against."""
+    global dashboard_html, dashboard_etag
+    dashboard_html = render_dashboard()
+    dashboard_etag = '"%s"' % blake2b(dashboard_html, digest_size=8).hexdigest()
+
+# Rendered once and re-rendered only when the alert thresholds change
+refresh_dashboard()
+
+@app.get("/dashboard", response_class=HTMLResponse)
+def advanced_dashboard(request: Request, username: str = Depends(authenticate)):
+    # private: the page is behind auth and must not be kept by shared caches.
+    # no-cache: browsers keep it but revalidate every time, so a threshold
+    # change is seen at once while an unchanged page costs only a 304
+    headers = {"Cache-Control": "private, no-cache", "ETag": dashboard_etag}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip() in (dashboard_etag, "W/" + dashboard_etag) for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=dashboard_html, headers=headers)
 
 # Add more endpoints for telemetry, logs, etc. as needed
 
@@ -466,4 +618,18 @@ def dashboard():
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content) 
\ No newline at end of file
+    return HTMLResponse(content=html_content)
+
+# Run with uvloop and httptools: python main.py. Each worker is a separate
+# process with its own satellite connection and telemetry sampler, so keep
+# SPACECOMM_WORKERS at 1 unless those are moved out of the app
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        "main:app",
+        host=os.environ.get("SPACECOMM_HOST", "127.0.0.1"),
+        port=int(os.environ.get("SPACECOMM_PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("SPACECOMM_WORKERS", "1"))
+    )
@@ -1,108 +1,361 @@
 import socket
+import errno
 import threading
+import contextlib
+import asyncio
 import time
+import itertools
+import functools
 import struct
-from typing import Optional
+import re
+from typing import Optional, Union
+from enum import IntEnum
 import random
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
+import logging
+import os
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # optional: without it uploads are built in memory
+    MultipartEncoder = None
+
+logger = logging.getLogger(__name__)
 
 # Constants for Space Packet Protocol (simplified CCSDS)
 PRIMARY_HEADER_FORMAT = '>HHH'  # Example: 6 bytes primary header
 PRIMARY_HEADER_SIZE = 6
 MAX_PACKET_SIZE = 1024  # Adjust as needed
 RETRY_LIMIT = 5
-RETRY_DELAY = 2  # seconds
+RETRY_BASE_DELAY = 0.05  # seconds; doubled after each failed attempt
+RETRY_MAX_DELAY = 2.0  # seconds
+SOCKET_TIMEOUT = 10  # seconds
+SOCKET_BUFFER_SIZE = 4 << 20  # bytes, UDP receive buffer; the kernel may clamp this to its configured maximum
+# Fixed TCP send/receive buffer size in bytes. Setting one turns off the kernel's
+# buffer autotuning for the socket (and is clamped to net.core.rmem_max/wmem_max
+# on Linux), so by default TCP buffers are left to autotuning
+TCP_BUFFER_SIZE: Optional[int] = None
+
+# Precompiled packers so the format strings are not re-parsed per packet
+_HDR_STRUCT = struct.Struct(PRIMARY_HEADER_FORMAT)
+_CMD_STRUCT = struct.Struct('>B')
+
+# sendmsg (scatter/gather writes) is unavailable on Windows
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+
+# Telemetry payloads are comma-separated key=value pairs
+_TM_RE = re.compile(rb'([^=,]*)=([^,]*)')
+
+# Steering: position axes and proportional gain; output is 3 big-endian float32
+STEERING_KEYS = ('pos_x', 'pos_y', 'pos_z')
+STEERING_GAIN = 0.1
+
+# Numeric telemetry fields, in the order used by request_telemetry_vector();
+# the steering axes come first
+TELEMETRY_KEYS = STEERING_KEYS + ('vel_x', 'vel_y', 'vel_z')
+_TELEM_IDX = {k.encode(): i for i, k in enumerate(TELEMETRY_KEYS)}
+
+# Stub diagnostics ranges: snr_db, ber, temperature_c, power_w and the status draw
+_DIAG_LOWS = np.array([10.0, 1e-7, -20.0, 5.0, 0.0])
+_DIAG_HIGHS = np.array([40.0, 1e-4, 60.0, 50.0, 1.0])
+DIAG_BATCH = 256  # rows of stub readings generated per NumPy call
 
 BLOCKSTREAM_API = "https://api.blockstream.space"
 BLOCKSAT_CLI_PATH = "blocksat-cli"  # Ensure blocksat-cli is installed and in PATH
+RECEIVER_TYPES = ('standalone', 'usb', 'sdr')
+MONITOR_START_TIMEOUT = 10  # seconds to wait for the first reading from a new monitor
+# Seconds between order status polls; the last delay repeats until BROADCAST_TIMEOUT
+ORDER_POLL_DELAYS = (1, 2, 3, 5, 5, 10)
+BROADCAST_TIMEOUT = 300  # seconds
+# Signal strength line in blocksat-cli monitor output (adjust regex as needed)
+_SIG_RE = re.compile(r'Signal Strength: ([0-9.]+)')
 
 # Example command codes
-def get_command_code(command: str) -> int:
-    command_map = {
-        'reboot': 0x01,
-        'steer': 0x02,
-        'get_photo': 0x03,
-        'get_telemetry': 0x04,
-        # Add more as needed
-    }
-    return command_map.get(command, 0xFF)
+class Cmd(IntEnum):
+    REBOOT = 0x01
+    STEER = 0x02
+    GET_PHOTO = 0x03
+    GET_TELEMETRY = 0x04
+    # Add more as needed
+
+# Command name -> code, built once at import
+_COMMAND_MAP = {cmd.name.lower(): int(cmd) for cmd in Cmd}
+
+def get_command_code(command: Union[str, Cmd]) -> int:
+    if isinstance(command, Cmd):
+        return command
+    return _COMMAND_MAP.get(command, 0xFF)
+
+# Packed command code byte, cached so repeated commands skip the lookup and pack
+@functools.lru_cache(maxsize=16)
+def _packed_command(command: Union[str, Cmd]) -> bytes:
+    return _CMD_STRUCT.pack(get_command_code(command))
+
+def _steering_position(telemetry) -> np.ndarray:
+    """Return the STEERING_KEYS position of a telemetry dict or vector as float64."""
+    if isinstance(telemetry, np.ndarray):
+        position = telemetry[:len(STEERING_KEYS)].astype(np.float64)
+        if np.isnan(position).any():
+            raise ValueError("Telemetry is missing position fields")
+        return position
+    return np.fromiter((float(telemetry[k]) for k in STEERING_KEYS), dtype=np.float64, count=len(STEERING_KEYS))
+
+# Errors that another attempt will not fix; retry loops give up on these at once
+_NON_RETRYABLE_ERRNOS = frozenset({errno.ECONNREFUSED})
+
+def _is_retryable(e: Exception) -> bool:
+    return getattr(e, 'errno', None) not in _NON_RETRYABLE_ERRNOS
+
+def _backoff(attempt: int) -> float:
+    """Delay before the next attempt: truncated exponential backoff with jitter."""
+    return min(RETRY_BASE_DELAY * (2 ** attempt), RETRY_MAX_DELAY) * random.uniform(0.5, 1.5)
 
 class SatelliteComm:
     """
     Handles communication with the satellite using TCP/UDP sockets.
     Implements packet-level retry, error handling, and supports sending/receiving commands and data.
     """
-    def __init__(self, host: str, port: int, use_udp: bool = False):
+    def __init__(self, host: str, port: int, use_udp: bool = False, thread_safe: bool = False):
         self.host = host
         self.port = port
         self.use_udp = use_udp
         self.sock: Optional[socket.socket] = None
-        self.lock = threading.Lock()
+        # Guards (re)connecting only; socket I/O runs outside the lock.
+        # Pass thread_safe=True when the instance is shared between threads.
+        self.lock = threading.Lock() if thread_safe else contextlib.nullcontext()
         self.connected = False
+        self._connect_error: Optional[Exception] = None
+        # Sequence count of outgoing commands; next() on a count is atomic, so
+        # threads sharing the instance never reuse a number
+        self._seq = itertools.count(1)
         # Packet counters
         self.packets_sent = 0
         self.packets_received = 0
+        # Source of the stub antenna diagnostics
+        self._diag_rng = np.random.default_rng()
+        self._diag_samples = iter(())
 
     def connect(self):
         """Establish connection to the satellite."""
         try:
             if self.use_udp:
                 self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._configure_socket(self.sock)
             else:
                 self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.sock.settimeout(10)
+                self._configure_socket(self.sock)
+                self.sock.settimeout(SOCKET_TIMEOUT)
                 self.sock.connect((self.host, self.port))
             self.connected = True
         except Exception as e:
-            print(f"[ERROR] Connection failed: {e}")
+            logger.error("Connection failed: %s", e)
+            self._connect_error = e
             self.connected = False
 
+    def _configure_socket(self, sock: socket.socket):
+        """
+        Tune a new socket before connecting: disable Nagle so small command packets
+        go out immediately, and enlarge the UDP receive buffer for photo downloads.
+        TCP buffers are only fixed when TCP_BUFFER_SIZE is set.
+        """
+        if self.use_udp:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        else:
+            if TCP_BUFFER_SIZE is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, TCP_BUFFER_SIZE)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, TCP_BUFFER_SIZE)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
     def disconnect(self):
         """Close the connection."""
         if self.sock:
             self.sock.close()
         self.connected = False
 
+    def _ensure_connected(self):
+        """Connect if needed, letting only one thread reconnect at a time."""
+        with self.lock:
+            if not self.connected:
+                self.connect()
+                if not self.connected:
+                    raise self._connect_error
+
     def send_packet(self, data: bytes) -> bool:
         """Send a packet with retry logic."""
+        return self.send_packet_iov((data,))
+
+    def send_packet_iov(self, buffers) -> bool:
+        """
+        Send a packet given as a sequence of buffers with retry logic.
+        The buffers are gathered by the kernel into one write, so a header and
+        payload go out together without first being joined in Python.
+        """
         for attempt in range(RETRY_LIMIT):
             try:
-                with self.lock:
-                    if not self.connected:
-                        self.connect()
-                    if self.use_udp:
-                        self.sock.sendto(data, (self.host, self.port))
-                    else:
-                        self.sock.sendall(data)
-                    self.packets_sent += 1
+                # On an established connection this sends straight away; the
+                # lock is only taken to reconnect
+                if not self.connected:
+                    self._ensure_connected()
+                self._sendmsg_all(buffers)
+                self.packets_sent += 1
                 return True
             except Exception as e:
-                print(f"[ERROR] Send failed (attempt {attempt+1}): {e}")
+                logger.error("Send failed (attempt %d): %s", attempt + 1, e)
                 self.disconnect()
-                time.sleep(RETRY_DELAY)
+                if not _is_retryable(e):
+                    break
+                time.sleep(_backoff(attempt))
         return False
 
+    def _sendmsg_all(self, buffers):
+        """Write all buffers with one sendmsg call, finishing a short TCP write with sendall."""
+        if not _HAS_SENDMSG:
+            data = b''.join(buffers)
+            if self.use_udp:
+                self.sock.sendto(data, (self.host, self.port))
+            else:
+                self.sock.sendall(data)
+            return
+        if self.use_udp:
+            self.sock.sendmsg(buffers, (), 0, (self.host, self.port))
+            return
+        sent = self.sock.sendmsg(buffers)
+        if sent < sum(len(b) for b in buffers):
+            self.sock.sendall(b''.join(buffers)[sent:])
+
     def receive_packet(self, expected_size=MAX_PACKET_SIZE) -> Optional[bytes]:
         """Receive a packet with retry logic."""
         for attempt in range(RETRY_LIMIT):
             try:
-                with self.lock:
-                    if not self.connected:
-                        self.connect()
-                    if self.use_udp:
-                        data, _ = self.sock.recvfrom(expected_size)
-                    else:
-                        data = self.sock.recv(expected_size)
+                if not self.connected:
+                    self._ensure_connected()
+                if self.use_udp:
+                    data, _ = self.sock.recvfrom(expected_size)
+                else:
+                    data = self.sock.recv(expected_size)
+                if data:
+                    self.packets_received += 1
+                    return data
+            except Exception as e:
+                logger.error("Receive failed (attempt %d): %s", attempt + 1, e)
+                self.disconnect()
+                if not _is_retryable(e):
+                    break
+                time.sleep(_backoff(attempt))
+        return None
+
+    def receive_packet_into(self, buffer, expected_size=MAX_PACKET_SIZE) -> int:
+        """
+        Receive a packet directly into a caller-owned buffer with retry logic.
+        Returns the number of bytes written, or 0 if nothing could be received.
+        """
+        for attempt in range(RETRY_LIMIT):
+            try:
+                if not self.connected:
+                    self._ensure_connected()
+                if self.use_udp:
+                    nbytes, _ = self.sock.recvfrom_into(buffer, expected_size)
+                else:
+                    nbytes = self.sock.recv_into(buffer, expected_size)
+                if nbytes:
+                    self.packets_received += 1
+                    return nbytes
+            except Exception as e:
+                logger.error("Receive failed (attempt %d): %s", attempt + 1, e)
+                self.disconnect()
+                if not _is_retryable(e):
+                    break
+                time.sleep(_backoff(attempt))
+        return 0
+
+    # Asyncio API: these wait on socket readiness in the event loop instead of
+    # blocking a thread, so many packets/streams can be serviced from one loop.
+    # They need the non-blocking socket made by connect_async(); don't mix them
+    # with the blocking methods on the same connection.
+
+    async def connect_async(self):
+        """Establish a non-blocking connection to the satellite."""
+        loop = asyncio.get_running_loop()
+        try:
+            kind = socket.SOCK_DGRAM if self.use_udp else socket.SOCK_STREAM
+            self.sock = socket.socket(socket.AF_INET, kind)
+            self._configure_socket(self.sock)
+            self.sock.setblocking(False)
+            # For UDP this only fixes the peer address used by send/recv
+            await asyncio.wait_for(loop.sock_connect(self.sock, (self.host, self.port)), SOCKET_TIMEOUT)
+            self.connected = True
+        except Exception as e:
+            logger.error("Connection failed: %s", e)
+            self._connect_error = e
+            self.connected = False
+
+    async def _ensure_connected_async(self):
+        """Connect with connect_async(), raising the connection error if it fails."""
+        await self.connect_async()
+        if not self.connected:
+            raise self._connect_error
+
+    async def send_packet_async(self, data: bytes) -> bool:
+        """Send a packet with retry logic without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(RETRY_LIMIT):
+            try:
+                if not self.connected:
+                    await self._ensure_connected_async()
+                await asyncio.wait_for(loop.sock_sendall(self.sock, data), SOCKET_TIMEOUT)
+                self.packets_sent += 1
+                return True
+            except Exception as e:
+                logger.error("Send failed (attempt %d): %s", attempt + 1, e)
+                self.disconnect()
+                if not _is_retryable(e):
+                    break
+                await asyncio.sleep(_backoff(attempt))
+        return False
+
+    async def receive_packet_async(self, expected_size=MAX_PACKET_SIZE) -> Optional[bytes]:
+        """Receive a packet with retry logic without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(RETRY_LIMIT):
+            try:
+                if not self.connected:
+                    await self._ensure_connected_async()
+                data = await asyncio.wait_for(loop.sock_recv(self.sock, expected_size), SOCKET_TIMEOUT)
                 if data:
                     self.packets_received += 1
                     return data
             except Exception as e:
-                print(f"[ERROR] Receive failed (attempt {attempt+1}): {e}")
+                logger.error("Receive failed (attempt %d): %s", attempt + 1, e)
                 self.disconnect()
-                time.sleep(RETRY_DELAY)
+                if not _is_retryable(e):
+                    break
+                await asyncio.sleep(_backoff(attempt))
         return None
 
+    async def iter_photo_async(self):
+        """
+        Request a photo from the satellite and yield its payload chunks as they arrive.
+        Join the chunks (b''.join) to get the whole image.
+        """
+        if not await self.send_packet_async(self._command_packet(Cmd.GET_PHOTO)):
+            logger.error("Failed to send photo request command.")
+            return
+        while True:
+            packet = await self.receive_packet_async()
+            if not packet:
+                logger.error("Photo packet receive failed.")
+                return
+            apid, seq, payload = self.parse_space_packet(packet)
+            # Example: last packet is marked by a special byte (0xFF)
+            if payload[-1:] == b'\xFF':
+                yield payload[:-1]
+                return
+            yield payload
+
     def build_space_packet(self, apid: int, seq: int, payload: bytes) -> bytes:
         """
         Build a CCSDS-like space packet.
@@ -111,46 +364,64 @@ class SatelliteComm:
         payload: Data payload
         """
         length = len(payload) + PRIMARY_HEADER_SIZE - 1
-        header = struct.pack(PRIMARY_HEADER_FORMAT, apid, seq, length)
+        header = _HDR_STRUCT.pack(apid, seq, length)
         return header + payload
 
     def parse_space_packet(self, packet: bytes):
-        """Parse a CCSDS-like space packet."""
+        """
+        Parse a CCSDS-like space packet.
+        The payload is returned as a memoryview into packet, so no copy is made;
+        call bytes(payload) if an independent bytes object is needed.
+        """
         if len(packet) < PRIMARY_HEADER_SIZE:
             raise ValueError("Packet too short")
-        header = packet[:PRIMARY_HEADER_SIZE]
-        apid, seq, length = struct.unpack(PRIMARY_HEADER_FORMAT, header)
-        payload = packet[PRIMARY_HEADER_SIZE:]
+        mv = memoryview(packet)
+        apid, seq, length = _HDR_STRUCT.unpack_from(mv, 0)
+        payload = mv[PRIMARY_HEADER_SIZE:]
         return apid, seq, payload
 
-    def send_command(self, command: str, params: Optional[bytes] = None) -> bool:
+    def send_command(self, command: Union[str, Cmd], params: Optional[bytes] = None) -> bool:
         """
         Send a command to the satellite.
-        command: Command string (e.g., 'reboot', 'steer')
+        command: Cmd member or command string (e.g., 'reboot', 'steer')
         params: Optional parameters as bytes
         """
-        code = get_command_code(command)
-        payload = struct.pack('>B', code) + (params or b'')
-        packet = self.build_space_packet(apid=0x100, seq=int(time.time()) & 0xFFFF, payload=payload)
-        return self.send_packet(packet)
+        return self.send_packet_iov(self._command_buffers(command, params))
+
+    def _command_buffers(self, command: Union[str, Cmd], params: Optional[bytes] = None) -> list:
+        """Return the header, command code and parameters of a command packet as separate buffers."""
+        code = _packed_command(command)
+        params = params or b''
+        seq = next(self._seq) & 0xFFFF
+        header = _HDR_STRUCT.pack(0x100, seq, PRIMARY_HEADER_SIZE + len(code) + len(params) - 1)
+        return [header, code, params]
 
-    def request_photo(self) -> Optional[bytes]:
+    def _command_packet(self, command: Union[str, Cmd], params: Optional[bytes] = None) -> bytes:
+        """Build the space packet carrying a command and its parameters."""
+        return b''.join(self._command_buffers(command, params))
+
+    def request_photo(self) -> Optional[bytearray]:
         """
-        Request a photo from the satellite and receive it as bytes.
-        Handles packet reassembly if needed.
+        Request a photo from the satellite and receive it as a bytearray.
+        Handles packet reassembly if needed. The bytearray is returned as built,
+        without a further copy into bytes.
         """
-        if not self.send_command('get_photo'):
-            print("[ERROR] Failed to send photo request command.")
+        if not self.send_command(Cmd.GET_PHOTO):
+            logger.error("Failed to send photo request command.")
             return None
-        photo_data = b''
+        # Every packet is received into one reusable buffer and its payload is
+        # appended straight to the photo, so no per-packet bytes are allocated
+        packet_buf = bytearray(MAX_PACKET_SIZE)
+        packet_view = memoryview(packet_buf)
+        photo_data = bytearray()
         while True:
-            packet = self.receive_packet()
-            if not packet:
-                print("[ERROR] Photo packet receive failed.")
+            nbytes = self.receive_packet_into(packet_buf)
+            if not nbytes:
+                logger.error("Photo packet receive failed.")
                 break
-            apid, seq, payload = self.parse_space_packet(packet)
+            apid, seq, payload = self.parse_space_packet(packet_view[:nbytes])
             # Example: last packet is marked by a special byte (0xFF)
-            if payload.endswith(b'\xFF'):
+            if payload[-1:] == b'\xFF':
                 photo_data += payload[:-1]
                 break
             else:
@@ -161,41 +432,57 @@ class SatelliteComm:
         """
         Request telemetry data from the satellite and parse it into a dictionary.
         """
-        if not self.send_command('get_telemetry'):
-            print("[ERROR] Failed to send telemetry request command.")
+        payload = self._receive_telemetry_payload()
+        if payload is None:
+            return None
+        # Example: parse telemetry (assume simple key-value pairs, comma-separated)
+        # in one regex pass over the raw bytes, decoding only the matched fields
+        return {k.decode(errors='ignore'): v.decode(errors='ignore') for k, v in _TM_RE.findall(payload)}
+
+    def request_telemetry_vector(self) -> Optional[np.ndarray]:
+        """
+        Request telemetry data and parse the known numeric fields (TELEMETRY_KEYS)
+        into a float64 array in that order. Missing or non-numeric fields are NaN.
+        """
+        payload = self._receive_telemetry_payload()
+        if payload is None:
+            return None
+        values = np.full(len(TELEMETRY_KEYS), np.nan)
+        for k, v in _TM_RE.findall(payload):
+            i = _TELEM_IDX.get(k)
+            if i is not None:
+                try:
+                    values[i] = float(v)
+                except ValueError:
+                    pass
+        return values
+
+    def _receive_telemetry_payload(self):
+        """Send the telemetry request and return the payload of the reply, or None on failure."""
+        if not self.send_command(Cmd.GET_TELEMETRY):
+            logger.error("Failed to send telemetry request command.")
             return None
         packet = self.receive_packet()
         if not packet:
-            print("[ERROR] Telemetry packet receive failed.")
+            logger.error("Telemetry packet receive failed.")
             return None
         apid, seq, payload = self.parse_space_packet(packet)
-        # Example: parse telemetry (assume simple key-value pairs, comma-separated)
-        try:
-            telemetry_str = payload.decode(errors='ignore')
-            telemetry = dict(item.split('=') for item in telemetry_str.split(',') if '=' in item)
-            return telemetry
-        except Exception as e:
-            print(f"[ERROR] Telemetry parsing failed: {e}")
-            return None
+        return payload
 
-    def calculate_steering(self, current_telemetry: dict, target_telemetry: dict) -> bytes:
+    def calculate_steering(self, current_telemetry, target_telemetry) -> bytes:
         """
         Calculate steering command parameters to get back on proper telemetry.
+        Each telemetry may be a dict or an array from request_telemetry_vector().
         Returns parameters as bytes to be sent with the 'steer' command.
         """
         # Example: Assume telemetry has 'pos_x', 'pos_y', 'pos_z', 'vel_x', 'vel_y', 'vel_z'
         try:
-            delta_x = float(target_telemetry['pos_x']) - float(current_telemetry['pos_x'])
-            delta_y = float(target_telemetry['pos_y']) - float(current_telemetry['pos_y'])
-            delta_z = float(target_telemetry['pos_z']) - float(current_telemetry['pos_z'])
-            # Simple proportional control (for demo)
-            steer_x = delta_x * 0.1
-            steer_y = delta_y * 0.1
-            steer_z = delta_z * 0.1
-            # Pack as 3 floats
-            return struct.pack('>fff', steer_x, steer_y, steer_z)
+            current = _steering_position(current_telemetry)
+            target = _steering_position(target_telemetry)
+            # Simple proportional control (for demo), packed as big-endian float32
+            return ((target - current) * STEERING_GAIN).astype('>f4').tobytes()
         except Exception as e:
-            print(f"[ERROR] Steering calculation failed: {e}")
+            logger.error("Steering calculation failed: %s", e)
             return b''
 
     def get_antenna_signal_strength(self) -> float:
@@ -212,16 +499,16 @@ class SatelliteComm:
         """
         for attempt in range(max_attempts):
             signal = self.get_antenna_signal_strength()
-            print(f"[INFO] Antenna signal strength: {signal:.2f}")
+            logger.info("Antenna signal strength: %.2f", signal)
             if signal >= min_signal:
                 self.connect()
                 if self.connected:
-                    print("[INFO] Connected to satellite (signal sufficient).")
+                    logger.info("Connected to satellite (signal sufficient).")
                     return True
             else:
-                print(f"[WARN] Signal too weak (attempt {attempt+1}/{max_attempts}). Retrying...")
+                logger.warning("Signal too weak (attempt %d/%d). Retrying...", attempt + 1, max_attempts)
                 time.sleep(2)
-        print("[ERROR] Could not connect: antenna signal too weak.")
+        logger.error("Could not connect: antenna signal too weak.")
         return False
 
     def get_current_signal_strength(self) -> float:
@@ -235,13 +522,21 @@ class SatelliteComm:
         Replace this stub with real hardware integration for diagnostics.
         """
         # TODO: Integrate with real antenna hardware API here
+        # Stub readings are drawn DIAG_BATCH rows at a time: a NumPy call per
+        # reading would cost more than it saves on five scalars
+        row = next(self._diag_samples, None)
+        if row is None:
+            batch = self._diag_rng.uniform(_DIAG_LOWS, _DIAG_HIGHS, (DIAG_BATCH, len(_DIAG_LOWS)))
+            self._diag_samples = iter(batch.tolist())
+            row = next(self._diag_samples)
+        snr_db, ber, temperature_c, power_w, status_draw = row
         diagnostics = {
             'signal_strength': self.get_antenna_signal_strength(),
-            'snr_db': random.uniform(10, 40),
-            'ber': random.uniform(1e-7, 1e-4),
-            'temperature_c': random.uniform(-20, 60),
-            'power_w': random.uniform(5, 50),
-            'status': 'OK' if random.random() > 0.1 else 'WARNING'
+            'snr_db': snr_db,
+            'ber': ber,
+            'temperature_c': temperature_c,
+            'power_w': power_w,
+            'status': 'OK' if status_draw > 0.1 else 'WARNING'
         }
         return diagnostics
 
@@ -262,26 +557,42 @@ class BlockstreamSatelliteIntegration:
     """
     def __init__(self, receiver_type='standalone'):
         self.receiver_type = receiver_type  # 'standalone', 'usb', 'sdr', etc.
+        # Long-running blocksat-cli monitor and its most recent reading
+        self._monitor: Optional[subprocess.Popen] = None
+        self._monitor_lock = threading.Lock()
+        self._latest_signal: Optional[float] = None
+        self._first_reading = threading.Event()
+        # One HTTP session so API calls reuse kept-alive TLS connections
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
     def send_file(self, file_path, bid_msat=10000):
         """
         Send a file via Blockstream Satellite API. Returns order info and Lightning invoice.
         """
         url = f"{BLOCKSTREAM_API}/order"
-        files = {
-            'bid': (None, str(bid_msat)),
-            'file': open(file_path, 'rb')
-        }
-        response = requests.post(url, files=files)
+        with open(file_path, 'rb') as fh:
+            if MultipartEncoder is not None:
+                # Stream the body from disk instead of building it in memory
+                body = MultipartEncoder(fields={
+                    'bid': str(bid_msat),
+                    'file': (os.path.basename(file_path), fh, 'application/octet-stream')
+                })
+                response = self._http.post(url, data=body, headers={'Content-Type': body.content_type})
+            else:
+                files = {
+                    'bid': (None, str(bid_msat)),
+                    'file': fh
+                }
+                response = self._http.post(url, files=files)
         if response.status_code == 200:
             data = response.json()
-            print("Order placed! Pay this Lightning invoice to broadcast:")
-            print(data['lightning_invoice']['payreq'])
-            print("Order UUID:", data['uuid'])
-            print("Auth token:", data['auth_token'])
+            logger.info("Order placed! Pay this Lightning invoice to broadcast: %s", data['lightning_invoice']['payreq'])
+            logger.info("Order UUID: %s", data['uuid'])
+            logger.info("Auth token: %s", data['auth_token'])
             return data
         else:
-            print("Error:", response.text)
+            logger.error("Order failed: %s", response.text)
             return None
 
     def pay_invoice(self, payreq, lightning_cli_path='lightning-cli'):
@@ -290,38 +601,64 @@ class BlockstreamSatelliteIntegration:
         """
         try:
             result = subprocess.run([lightning_cli_path, 'pay', payreq], capture_output=True, text=True)
-            print(result.stdout)
+            logger.info("%s", result.stdout)
             return result.returncode == 0
         except Exception as e:
-            print(f"[ERROR] Lightning payment failed: {e}")
+            logger.error("Lightning payment failed: %s", e)
             return False
 
     def monitor_signal(self):
         """
         Monitor signal from the specified receiver using blocksat-cli.
         Returns the latest signal strength as a float (0.0-1.0), or None if not found.
+        The monitor is started on the first call and keeps running in the background;
+        a call that (re)starts it waits up to MONITOR_START_TIMEOUT for the first
+        reading, later calls return the most recent reading without waiting.
         """
         try:
-            if self.receiver_type == 'standalone':
-                cmd = [BLOCKSAT_CLI_PATH, 'standalone', 'monitor']
-            elif self.receiver_type == 'usb':
-                cmd = [BLOCKSAT_CLI_PATH, 'usb', 'monitor']
-            elif self.receiver_type == 'sdr':
-                cmd = [BLOCKSAT_CLI_PATH, 'sdr', 'monitor']
-            else:
+            if self.receiver_type not in RECEIVER_TYPES:
                 raise ValueError('Unknown receiver type')
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            # Parse signal strength from result.stdout (adjust regex as needed)
-            import re
-            match = re.search(r'Signal Strength: ([0-9.]+)', result.stdout)
-            if match:
-                return float(match.group(1))
-            else:
-                print("[WARN] Could not parse signal strength.")
-                return None
+            self._start_monitor()
         except Exception as e:
-            print(f"[ERROR] Signal monitoring failed: {e}")
+            logger.error("Signal monitoring failed: %s", e)
             return None
+        self._first_reading.wait(MONITOR_START_TIMEOUT)
+        if self._latest_signal is None:
+            logger.warning("Could not parse signal strength.")
+        return self._latest_signal
+
+    def _start_monitor(self):
+        """Start blocksat-cli monitor unless it is already running, with a thread reading its output."""
+        with self._monitor_lock:
+            if self._monitor is not None and self._monitor.poll() is None:
+                return
+            self._latest_signal = None
+            self._first_reading = threading.Event()
+            self._monitor = subprocess.Popen(
+                [BLOCKSAT_CLI_PATH, self.receiver_type, 'monitor'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1
+            )
+            threading.Thread(target=self._read_monitor, args=(self._monitor, self._first_reading), daemon=True).start()
+
+    def _read_monitor(self, proc, first_reading: threading.Event):
+        """
+        Record the signal strength from each monitor line as it arrives, setting
+        first_reading once a value is parsed or the monitor's output ends.
+        """
+        for line in proc.stdout:
+            match = _SIG_RE.search(line)
+            if match:
+                self._latest_signal = float(match.group(1))
+                first_reading.set()
+        first_reading.set()
+
+    def stop_monitor(self):
+        """Terminate the background blocksat-cli monitor, if running."""
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.terminate()
+                self._monitor.wait()
+                self._monitor = None
 
     def send_file_and_broadcast(self, file_path, bid_msat=10000, lightning_cli_path='lightning-cli'):
         """
@@ -332,41 +669,45 @@ class BlockstreamSatelliteIntegration:
         if not order:
             return False
         payreq = order['lightning_invoice']['payreq']
-        print("Paying invoice...")
+        logger.info("Paying invoice...")
         if not self.pay_invoice(payreq, lightning_cli_path):
-            print("[ERROR] Payment failed. Aborting broadcast.")
+            logger.error("Payment failed. Aborting broadcast.")
             return False
-        print("Payment sent. Waiting for broadcast...")
+        logger.info("Payment sent. Waiting for broadcast...")
         uuid = order['uuid']
         auth_token = order['auth_token']
-        # Poll for order status
-        for _ in range(30):  # Poll for up to 5 minutes
+        # Poll for order status, often at first and then every 10 s, for up to 5 minutes
+        deadline = time.monotonic() + BROADCAST_TIMEOUT
+        for delay in itertools.chain(ORDER_POLL_DELAYS, itertools.repeat(ORDER_POLL_DELAYS[-1])):
             status = self.get_order_status(uuid, auth_token)
-            print(f"Order status: {status}")
+            logger.info("Order status: %s", status)
             if status == 'sent':
-                print("Broadcast complete!")
+                logger.info("Broadcast complete!")
                 # HOOK: update charts/alerts here
                 return True
-            time.sleep(10)
-        print("[ERROR] Broadcast not completed in time.")
+            if time.monotonic() + delay > deadline:
+                break
+            time.sleep(delay)
+        logger.error("Broadcast not completed in time.")
         return False
 
     def get_order_status(self, uuid, auth_token):
         url = f"{BLOCKSTREAM_API}/order/{uuid}"
         headers = {'X-Auth-Token': auth_token}
-        response = requests.get(url, headers=headers)
+        response = self._http.get(url, headers=headers)
         if response.status_code == 200:
             data = response.json()
             return data.get('status', 'unknown')
         else:
-            print("[ERROR] Could not fetch order status.")
+            logger.error("Could not fetch order status.")
             return 'unknown'
 
 # Example usage (for testing, not for production):
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     comm = SatelliteComm('127.0.0.1', 5000)
     comm.connect()
-    comm.send_command('reboot')
+    comm.send_command(Cmd.REBOOT)
     photo = comm.request_photo()
     if photo:
         with open('photo.jpg', 'wb') as f: